@@ -1,62 +1,261 @@
 import os
-import gzip
 import zlib
 import json
+import atexit
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, filedialog, messagebox, simpledialog
 import shutil
+import subprocess
 import psutil
 
+try:
+    # zlib-ng's SIMD-accelerated deflate, if installed; same API, levels and formats as zlib
+    from zlib_ng import zlib_ng as deflate
+except ImportError:
+    deflate = zlib
+
+try:
+    # ISA-L inflates faster still; its compressor only has levels 0-3, so it is used for reading
+    from isal import isal_zlib as inflate
+except ImportError:
+    inflate = deflate
+
+try:
+    import zstandard
+except ImportError: # optional; zstd is only offered when installed
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError: # optional; lz4 is only offered when installed
+    lz4_frame = None
+
+try:
+    import orjson
+except ImportError: # optional speed-up; stdlib json is used without it
+    orjson = None
+
+SMALL_FILE_SIZE = 256 * 1024 # gzip/zlib inputs below this are compressed in a single call
+PIGZ_MIN_SIZE = 4 * 1024 * 1024 # gzip files larger than this go through pigz when it is installed
+_PIGZ = shutil.which('pigz') # multi-threaded gzip; writes the same format as zlib with wbits=31
+METADATA_FLUSH_DELAY_MS = 2000 # Metadata changes are written in one batch this long after the first one
+
+# Extensions that are never compressed: our own output, and system files
+_SKIP_EXTS = frozenset({'.gz', '.zlib', '.zst', '.lz4', '.sys', '.ini'})
+
+def _ext_of(path):
+    # Suffix from the file name's last dot. Unlike splitext, a name that is only an
+    # extension counts too: a file called ".gz" is still compressed output
+    name = os.path.basename(path)
+    dot = name.rfind('.')
+    return name[dot:].lower() if dot >= 0 else ''
+
+# Leading bytes of formats whose content is already compressed (gzip, zstd, lz4,
+# zip/office, JPEG, PNG, bzip2, xz, 7z, RAR); deflating them again wastes CPU
+_COMPRESSED_MAGIC = (b'\x1f\x8b', b'\x28\xb5\x2f\xfd', b'\x04\x22\x4d\x18', b'PK\x03\x04',
+                     b'\xff\xd8\xff', b'\x89PNG\r\n\x1a\n', b'BZh', b'\xfd7zXZ\x00',
+                     b'7z\xbc\xaf\x27\x1c', b'Rar!\x1a\x07')
+
+# Built once: json.dumps constructs a fresh encoder for any non-default option like indent
+_PRETTY_ENCODER = json.JSONEncoder(indent=2)
+_COMPACT_ENCODER = json.JSONEncoder()
+
+def _json_dumps(obj, indent=False):
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return (_PRETTY_ENCODER if indent else _COMPACT_ENCODER).encode(obj).encode()
+
+def _json_loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
 class FileCompressor:
+    COPY_BUFSIZE = 1024 * 1024 # 1 MiB per read/write in every streaming (de)compression loop
+
+    # Algorithm name -> extension of its output; optional codecs only when installed
+    EXTENSIONS = {'gzip': '.gz', 'zlib': '.zlib'}
+    if zstandard is not None:
+        EXTENSIONS['zstd'] = '.zst'
+    if lz4_frame is not None:
+        EXTENSIONS['lz4'] = '.lz4' # speed mode: fast (de)compression, lower ratio
+
+    # Level used when the caller doesn't pick one (each library's own default)
+    DEFAULT_LEVELS = {'gzip': 9, 'zlib': 6, 'zstd': 3, 'lz4': 0}
+    # (fastest, smallest) levels each algorithm accepts; lz4 switches to its slower HC mode from 3
+    LEVEL_RANGES = {'gzip': (1, 9), 'zlib': (1, 9), 'zstd': (1, 22), 'lz4': (0, 16)}
+
+    # Files above this size default to zstd (when installed): better ratio at a fraction of the CPU
+    LARGE_FILE_SIZE = 16 * 1024 * 1024
+
+    def default_algorithm(self, size):
+        return 'zstd' if 'zstd' in self.EXTENSIONS and size > self.LARGE_FILE_SIZE else 'gzip'
+
     def __init__(self, metadata_file="compression_metadata.json"):
         self.metadata_file = metadata_file
+        # Changes since the last snapshot are appended here, one JSON record per line
+        self.journal_file = metadata_file + '.log'
+        self._journal = None
+        self._journal_records = 0
+        self._pending = [] # Records applied in memory but not yet written; see flush()
+        self.revision = 0 # Bumped on every change so views can skip redundant redraws
         self.metadata = self.load_metadata()
+        # A crash skips the exit-time compaction; don't carry a long journal into this session
+        if self._journal_too_long():
+            self.save_metadata()
+        atexit.register(self.compact)
 
     def load_metadata(self):
+        metadata = {}
         if os.path.exists(self.metadata_file):
             try:
-                with open(self.metadata_file, 'r') as f:
-                    return json.load(f)
+                with open(self.metadata_file, 'rb') as f:
+                    metadata = _json_loads(f.read())
             except json.JSONDecodeError:
                 messagebox.showwarning("Warning", "Metadata file is corrupted. Starting fresh.")
-        return {}
+        # Replay the journal on top of the snapshot
+        if os.path.exists(self.journal_file):
+            replayed = 0
+            with open(self.journal_file, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break # torn final record from an interrupted write
+                    try:
+                        record = _json_loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    self._apply(metadata, record)
+                    self._journal_records += 1
+                    replayed += len(line)
+            if replayed < os.path.getsize(self.journal_file):
+                # Cut the torn tail off, or the next append would be glued onto it and lost too
+                os.truncate(self.journal_file, replayed)
+        return metadata
+
+    @staticmethod
+    def _apply(metadata, record):
+        if record['op'] == 'add':
+            metadata[record['key']] = record['meta']
+        else:
+            metadata.pop(record['key'], None)
+
+    def _record(self, op, key, meta=None):
+        # Apply one change in memory; it reaches the journal on the next flush()
+        record = {'op': op, 'key': key, 'meta': meta}
+        self._apply(self.metadata, record)
+        self._pending.append(record)
+        self.revision += 1
+
+    def flush(self):
+        # Append every pending change to the journal in one write
+        if not self._pending:
+            return
+        try:
+            if self._journal is None:
+                self._journal = open(self.journal_file, 'ab')
+            self._journal.write(b''.join(_json_dumps(record) + b'\n' for record in self._pending))
+            self._journal.flush()
+            self._journal_records += len(self._pending)
+            self._pending.clear()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save metadata: {e}")
+            return
+        if self._journal_too_long():
+            self.save_metadata()
+
+    def _journal_too_long(self):
+        return self._journal_records > 2 * len(self.metadata)
+
+    def compact(self):
+        if self._journal_records or self._pending:
+            self.save_metadata()
 
     def save_metadata(self):
         try:
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
+            # Write a temp file and swap it in, so a crash can't leave a torn file
+            tmp_path = self.metadata_file + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(_json_dumps(self.metadata, indent=True))
+                # On disk before the rename, or a crash could publish an empty file
+                f.flush()
+                if hasattr(os, 'fdatasync'):
+                    os.fdatasync(f.fileno())
+                else:
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, self.metadata_file)
+            # The snapshot now holds everything the journal recorded
+            if self._journal is not None:
+                self._journal.truncate(0)
+            else:
+                try:
+                    os.truncate(self.journal_file, 0)
+                except FileNotFoundError:
+                    pass
+            self._journal_records = 0
+            self._pending.clear()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save metadata: {e}")
 
-    def compress_file(self, file_path, algorithm='gzip'):
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File {file_path} not found")
-        if file_path.endswith(('.gz', '.zlib', '.sys', '.ini')):
+    def compress_file(self, file_path, algorithm=None, level=None):
+        # One stat both proves the file exists and supplies the timestamps to restore
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File {file_path} not found") from None
+        if _ext_of(file_path) in _SKIP_EXTS:
             raise ValueError("File is already compressed or is a system file")
 
-        st = os.stat(file_path)
+        # Sniff the content too: media and archives rarely shrink by more than 1%
+        with open(file_path, 'rb') as f:
+            head = f.read(16)
+        if head.startswith(_COMPRESSED_MAGIC) or head[4:8] == b'ftyp': # ftyp: MP4/MOV
+            raise ValueError("File content is already compressed (archive, image or video)")
+
+        if algorithm is None:
+            algorithm = self.default_algorithm(st.st_size)
+        if algorithm not in self.EXTENSIONS:
+            raise ValueError(f"Unsupported compression algorithm: {algorithm}")
+        if level is None:
+            level = self.DEFAULT_LEVELS[algorithm]
+        output_path = file_path + self.EXTENSIONS[algorithm]
+
         metadata = {
             'original_path': file_path,
+            'size': st.st_size,
             'atime': st.st_atime,
             'mtime': st.st_mtime,
-            'algorithm': algorithm
+            'algorithm': algorithm,
+            'level': level
         }
 
-        ext = '.gz' if algorithm == 'gzip' else '.zlib'
-        output_path = file_path + ext
-
-        if algorithm == 'gzip':
-            with open(file_path, 'rb') as f_in, gzip.open(output_path, 'wb') as f_out:
-                shutil.copyfileobj(f_in, f_out)
-        else:
+        if algorithm == 'gzip' and _PIGZ and st.st_size > PIGZ_MIN_SIZE:
+            with open(output_path, 'wb') as f_out:
+                subprocess.run([_PIGZ, f'-{level}', '-c', file_path], stdout=f_out, check=True)
+        elif algorithm == 'zstd':
+            # Multi-threaded zstd frames; threads=-1 uses every logical CPU
+            cctx = zstandard.ZstdCompressor(level=level, threads=-1)
             with open(file_path, 'rb') as f_in, open(output_path, 'wb') as f_out:
-                f_out.write(zlib.compress(f_in.read()))
-
-        if not os.path.exists(output_path):
-            raise RuntimeError("Compression failed: output file not created")
-
-        self.metadata[output_path] = metadata
-        self.save_metadata()
+                cctx.copy_stream(f_in, f_out, read_size=self.COPY_BUFSIZE, write_size=self.COPY_BUFSIZE)
+        elif algorithm == 'lz4':
+            with open(file_path, 'rb') as f_in, lz4_frame.open(output_path, 'wb', compression_level=level, block_size=lz4_frame.BLOCKSIZE_MAX4MB) as f_out:
+                shutil.copyfileobj(f_in, f_out, length=self.COPY_BUFSIZE)
+        else: # gzip or zlib
+            # wbits=31 makes zlib write the gzip header and CRC trailer itself
+            co = deflate.compressobj(level, deflate.DEFLATED, 31 if algorithm == 'gzip' else deflate.MAX_WBITS)
+            if st.st_size < SMALL_FILE_SIZE:
+                # Small files in one call: the read loop would cost more than the deflate itself
+                with open(file_path, 'rb') as f_in:
+                    data = f_in.read()
+                with open(output_path, 'wb') as f_out:
+                    f_out.write(co.compress(data) + co.flush())
+            else:
+                # Stream through the compressobj so memory stays bounded by the read buffer
+                with open(file_path, 'rb') as f_in, open(output_path, 'wb') as f_out:
+                    while chunk := f_in.read(self.COPY_BUFSIZE):
+                        out = co.compress(chunk)
+                        if out: # deflate often buffers a whole chunk without emitting anything
+                            f_out.write(out)
+                    f_out.write(co.flush())
+
+        self._record('add', output_path, metadata)
         return output_path
 
     def decompress_file(self, compressed_path):
@@ -67,20 +266,49 @@ class FileCompressor:
         original_path = meta['original_path']
         algorithm = meta['algorithm']
 
-        if algorithm == 'gzip':
-            with gzip.open(compressed_path, 'rb') as f_in, open(original_path, 'wb') as f_out:
-                shutil.copyfileobj(f_in, f_out)
-        else:
+        if algorithm == 'gzip' and _PIGZ and os.path.getsize(compressed_path) > PIGZ_MIN_SIZE:
+            with open(original_path, 'wb') as f_out:
+                subprocess.run([_PIGZ, '-d', '-c', compressed_path], stdout=f_out, check=True)
+        elif algorithm == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("Decompressing zstd files requires the 'zstandard' package")
             with open(compressed_path, 'rb') as f_in, open(original_path, 'wb') as f_out:
-                f_out.write(zlib.decompress(f_in.read()))
-
+                zstandard.ZstdDecompressor().copy_stream(f_in, f_out, read_size=self.COPY_BUFSIZE, write_size=self.COPY_BUFSIZE)
+        elif algorithm == 'lz4':
+            if lz4_frame is None:
+                raise RuntimeError("Decompressing lz4 files requires the 'lz4' package")
+            with lz4_frame.open(compressed_path, 'rb') as f_in, open(original_path, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out, length=self.COPY_BUFSIZE)
+        else: # gzip or zlib
+            wbits = 31 if algorithm == 'gzip' else zlib.MAX_WBITS
+            do = inflate.decompressobj(wbits)
+            with open(compressed_path, 'rb') as f_in, open(original_path, 'wb') as f_out:
+                while chunk := f_in.read(self.COPY_BUFSIZE):
+                    while chunk:
+                        if do.eof and algorithm == 'gzip':
+                            # A gzip file may hold several members back to back, and may be padded
+                            # with NUL bytes (tape and dd output often are), which gzip skips
+                            chunk = chunk.lstrip(b'\0')
+                            if not chunk:
+                                break
+                            do = inflate.decompressobj(wbits)
+                        out = do.decompress(chunk)
+                        if out:
+                            f_out.write(out)
+                        chunk = do.unused_data if do.eof and algorithm == 'gzip' else b''
+                f_out.write(do.flush())
+            if not do.eof:
+                raise RuntimeError("Decompression failed: compressed data is truncated")
+
+        # A short or oversized result (disk full, wrong data) shows up as a size mismatch
+        expected_size = meta.get('size')
+        if expected_size is not None:
+            actual_size = os.path.getsize(original_path)
+            if actual_size != expected_size:
+                raise RuntimeError(f"Decompression failed: expected {expected_size} bytes, got {actual_size}")
         os.utime(original_path, (meta['atime'], meta['mtime']))
 
-        if not os.path.exists(original_path):
-            raise RuntimeError("Decompression failed: output file not created")
-
-        del self.metadata[compressed_path]
-        self.save_metadata()
+        self._record('del', compressed_path)
         return original_path
 
 class CompressorGUI:
@@ -88,6 +316,10 @@ class CompressorGUI:
         self.root = root
         self.root.title("File Compressor")
         self.compressor = FileCompressor()
+        self._stat_cache = {} # directory -> (mtime_ns, names scanned, {name: size})
+        self._flush_job = None
+        self._shown_rows = {} # iid -> (values, tag) currently in the tree, in display order
+        self._rendered_revision = None # metadata revision the file list was last built from
         self.root.configure(bg='#2C2C2C')
         self.root.geometry("700x450")
         self.setup_gui()
@@ -147,14 +379,16 @@ class CompressorGUI:
 
         compress_btn = ttk.Button(btn_frame, text="Compress File", command=self.compress_file)
         decompress_btn = ttk.Button(btn_frame, text="Decompress File", command=self.decompress_file)
-        refresh_btn = ttk.Button(btn_frame, text="Refresh", command=self.refresh)
+        refresh_btn = ttk.Button(btn_frame, text="Refresh", command=lambda: self.refresh(force=True))
 
         for btn in (compress_btn, decompress_btn, refresh_btn):
             btn.pack(side='left', expand=True, padx=0, pady=0)
 
-    def refresh(self):
+    def refresh(self, force=False):
+        if force:
+            self._stat_cache.clear() # files may have changed on disk without a metadata change
         self.update_disk_usage()
-        self.update_file_list()
+        self.update_file_list(force)
 
     def update_disk_usage(self):
         try:
@@ -167,27 +401,102 @@ class CompressorGUI:
         except Exception as e:
             self.disk_label.config(text=f"Disk Usage Error: {e}")
 
-    def update_file_list(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def get_file_sizes(self, paths):
+        # One scandir per directory instead of an exists + getsize pair per row.
+        # Results are cached per directory and reused while its mtime is unchanged.
+        by_dir = {}
+        for path in paths:
+            by_dir.setdefault(os.path.dirname(path), []).append(path)
+        sizes = {}
+        for directory, dir_paths in by_dir.items():
+            wanted = {os.path.basename(p) for p in dir_paths}
+            try:
+                mtime = os.stat(directory or '.').st_mtime_ns
+                cached = self._stat_cache.get(directory)
+                if cached is None or cached[0] != mtime or not wanted <= cached[1]:
+                    with os.scandir(directory or '.') as it:
+                        entry_sizes = {e.name: e.stat().st_size for e in it if e.name in wanted and e.is_file()}
+                    cached = self._stat_cache[directory] = (mtime, wanted, entry_sizes)
+            except OSError:
+                cached = (None, wanted, {})
+            for path in dir_paths:
+                sizes[path] = cached[2].get(os.path.basename(path), 0)
+        return sizes
+
+    def schedule_flush(self):
+        # Changes made within the delay share one journal write
+        if self._flush_job is None:
+            self._flush_job = self.root.after(METADATA_FLUSH_DELAY_MS, self._flush_metadata)
+
+    def _flush_metadata(self):
+        self._flush_job = None
+        self.compressor.flush()
+
+    def update_file_list(self, force=False):
+        if not force and self._rendered_revision == self.compressor.revision:
+            return
+        self._rendered_revision = self.compressor.revision
+        rows = []
         if not self.compressor.metadata:
             self.placeholder.lift()
         else:
             self.placeholder.lower()
-            for idx,(path,meta) in enumerate(self.compressor.metadata.items()):
-                size = os.path.getsize(path) if os.path.exists(path) else 0
-                tag = 'evenrow' if idx % 2 == 0 else 'oddrow'
-                self.tree.insert('', 'end', iid=path, values=(os.path.basename(path), size, meta['algorithm']), tags=(tag,))
+            sizes = self.get_file_sizes(self.compressor.metadata)
+            rows = [(path, (os.path.basename(path), sizes[path], meta['algorithm']), 'evenrow' if idx % 2 == 0 else 'oddrow')
+                    for idx,(path,meta) in enumerate(self.compressor.metadata.items())]
+        self._show_rows(rows)
+
+    def _show_rows(self, rows):
+        # Diff against what is on screen so only new, changed and removed rows touch Tk
+        shown = self._shown_rows
+        wanted = {path: (values, tag) for path, values, tag in rows}
+        if shown and [p for p in shown if p in wanted] == [path for path, _, _ in rows if path in shown]:
+            stale = [p for p in shown if p not in wanted]
+            if stale:
+                self.tree.delete(*stale)
+            for idx, (path, values, tag) in enumerate(rows):
+                if path not in shown:
+                    self.tree.insert('', idx, iid=path, values=values, tags=(tag,))
+                elif shown[path] != (values, tag):
+                    self.tree.item(path, values=values, tags=(tag,))
+        else:
+            # First fill or a reorder: rebuild, with the columns hidden so Tk lays the view out once
+            children = self.tree.get_children()
+            if children:
+                self.tree.delete(*children)
+            self.tree.configure(displaycolumns=())
+            try:
+                for path, values, tag in rows:
+                    self.tree.insert('', 'end', iid=path, values=values, tags=(tag,))
+            finally:
+                self.tree.configure(displaycolumns='#all')
+        self._shown_rows = wanted
 
     def compress_file(self):
         path = filedialog.askopenfilename()
         if not path:
             return
-        use_gzip = messagebox.askyesno("Algorithm", "Use GZIP? (Yes for GZIP, No for ZLIB)")
-        alg = 'gzip' if use_gzip else 'zlib'
         try:
-            out = self.compressor.compress_file(path, alg)
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0 # gone already; compress_file below reports it
+        choices = ", ".join(self.compressor.EXTENSIONS)
+        alg = simpledialog.askstring("Algorithm", f"Algorithm ({choices}):", initialvalue=self.compressor.default_algorithm(size), parent=self.root)
+        if not alg:
+            return
+        alg = alg.strip().lower()
+        if alg not in self.compressor.EXTENSIONS:
+            messagebox.showerror("Error", f"Unsupported compression algorithm: {alg}")
+            return
+        low, high = self.compressor.LEVEL_RANGES[alg]
+        level = simpledialog.askinteger("Level", f"Compression level ({low} = fastest, {high} = smallest):", minvalue=low, maxvalue=high, initialvalue=self.compressor.DEFAULT_LEVELS[alg], parent=self.root)
+        if level is None:
+            return
+        try:
+            out = self.compressor.compress_file(path, alg, level)
             messagebox.showinfo("Success", f"Compressed to:\n{out}")
+            self.schedule_flush()
+            self._stat_cache.clear()
             self.refresh()
         except Exception as e:
             messagebox.showerror("Error", str(e))
@@ -201,6 +510,8 @@ class CompressorGUI:
         try:
             orig = self.compressor.decompress_file(comp)
             messagebox.showinfo("Success", f"Decompressed to:\n{orig}")
+            self.schedule_flush()
+            self._stat_cache.clear()
             self.refresh()
         except Exception as e:
             messagebox.showerror("Error", str(e))
@@ -1,68 +1,307 @@
 import os
-import gzip
 import zlib
 import json
+import atexit
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, filedialog, messagebox, simpledialog
 import shutil
+import subprocess
+import time
 import psutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+
+try:
+    # zlib-ng's SIMD-accelerated deflate, if installed; same API, levels and formats as zlib
+    from zlib_ng import zlib_ng as deflate
+except ImportError:
+    deflate = zlib
+
+try:
+    # ISA-L inflates faster still; its compressor only has levels 0-3, so it is used for reading
+    from isal import isal_zlib as inflate
+except ImportError:
+    inflate = deflate
+
+try:
+    import zstandard
+except ImportError: # optional; zstd is only offered when installed
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError: # optional; lz4 is only offered when installed
+    lz4_frame = None
+
+try:
+    import orjson
+except ImportError: # optional speed-up; stdlib json is used without it
+    orjson = None
 
 print("Starting GUI script...")
 
+AUTO_CHECK_INTERVAL_MS = 10000 # Disk usage / auto-compression check
+AUTO_JOB_POLL_MS = 200 # How often finished background compressions are collected
+DISK_USAGE_TTL = 2.0 # Seconds a disk usage reading is reused before psutil is asked again
+LOG_DRAIN_INTERVAL_MS = 100 # How often queued status messages are flushed
+LOG_DRAIN_BATCH = 200 # Max status messages handled per flush
+METADATA_FLUSH_DELAY_MS = 2000 # Metadata changes are written in one batch this long after the first one
+SMALL_FILE_SIZE = 256 * 1024 # gzip/zlib inputs below this are compressed in a single call
+PROBE_INLINE_MAX = 64 # Up to this many existence checks per tick are done inline, more go to the probe pool
+PIGZ_MIN_SIZE = 4 * 1024 * 1024 # gzip files larger than this go through pigz when it is installed
+_PIGZ = shutil.which('pigz') # multi-threaded gzip; writes the same format as zlib with wbits=31
+
+# Extensions that are never compressed: our own output, and system/temporary files
+_COMPRESSED_EXTS = frozenset({'.gz', '.zlib', '.zst', '.lz4'})
+_SKIP_EXTS = frozenset({'.sys', '.ini', '.dll', '.exe', '.log', '.tmp'})
+
+# Leading bytes of formats whose content is already compressed (gzip, zstd, lz4,
+# zip/office, JPEG, PNG, bzip2, xz, 7z, RAR); deflating them again wastes CPU
+_COMPRESSED_MAGIC = (b'\x1f\x8b', b'\x28\xb5\x2f\xfd', b'\x04\x22\x4d\x18', b'PK\x03\x04',
+                     b'\xff\xd8\xff', b'\x89PNG\r\n\x1a\n', b'BZh', b'\xfd7zXZ\x00',
+                     b'7z\xbc\xaf\x27\x1c', b'Rar!\x1a\x07')
+
+
+@lru_cache(maxsize=1024)
+def _ext_of(path):
+    # The auto-compress pass re-checks the same tracked paths on every tick.
+    # Suffix from the file name's last dot; unlike splitext, a name that is only an
+    # extension counts too: a file called ".gz" is still compressed output
+    name = os.path.basename(path)
+    dot = name.rfind('.')
+    return name[dot:].lower() if dot >= 0 else ''
+
+
+# Built once: json.dumps constructs a fresh encoder for any non-default option like indent
+_PRETTY_ENCODER = json.JSONEncoder(indent=2)
+_COMPACT_ENCODER = json.JSONEncoder()
+
+
+def _json_dumps(obj, indent=False):
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return (_PRETTY_ENCODER if indent else _COMPACT_ENCODER).encode(obj).encode()
+
+
+def _json_loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _compress_stream(file_path, output_path, algorithm, level, size, threads=-1):
+    # Module level so ProcessPoolExecutor workers can run it; metadata stays in the parent.
+    # threads caps pigz and zstd; -1 means every logical CPU
+    if algorithm == 'gzip' and _PIGZ and size > PIGZ_MIN_SIZE:
+        thread_args = ['-p', str(threads)] if threads > 0 else []
+        with open(output_path, 'wb') as f_out:
+            subprocess.run([_PIGZ, f'-{level}', *thread_args, '-c', file_path], stdout=f_out, check=True)
+    elif algorithm == 'zstd':
+        # Multi-threaded zstd frames
+        cctx = zstandard.ZstdCompressor(level=level, threads=threads)
+        with open(file_path, 'rb') as f_in, open(output_path, 'wb') as f_out:
+            cctx.copy_stream(f_in, f_out, read_size=FileCompressor.COPY_BUFSIZE, write_size=FileCompressor.COPY_BUFSIZE)
+    elif algorithm == 'lz4':
+        with open(file_path, 'rb') as f_in, lz4_frame.open(output_path, 'wb', compression_level=level, block_size=lz4_frame.BLOCKSIZE_MAX4MB) as f_out:
+            shutil.copyfileobj(f_in, f_out, length=FileCompressor.COPY_BUFSIZE)
+    else: # gzip or zlib
+        # wbits=31 makes zlib write the gzip header and CRC trailer itself
+        co = deflate.compressobj(level, deflate.DEFLATED, 31 if algorithm == 'gzip' else deflate.MAX_WBITS)
+        if size < SMALL_FILE_SIZE:
+            # Small files in one call: the read loop would cost more than the deflate itself
+            with open(file_path, 'rb') as f_in:
+                data = f_in.read()
+            with open(output_path, 'wb') as f_out:
+                f_out.write(co.compress(data) + co.flush())
+        else:
+            # Stream through the compressobj so memory stays bounded by the read buffer
+            with open(file_path, 'rb') as f_in, open(output_path, 'wb') as f_out:
+                while chunk := f_in.read(FileCompressor.COPY_BUFSIZE):
+                    out = co.compress(chunk)
+                    if out: # deflate often buffers a whole chunk without emitting anything
+                        f_out.write(out)
+                f_out.write(co.flush())
+
 
 class FileCompressor:
+    COPY_BUFSIZE = 1024 * 1024 # 1 MiB per read/write in every streaming (de)compression loop
+
+    # Algorithm name -> extension of its output; optional codecs only when installed
+    EXTENSIONS = {'gzip': '.gz', 'zlib': '.zlib'}
+    if zstandard is not None:
+        EXTENSIONS['zstd'] = '.zst'
+    if lz4_frame is not None:
+        EXTENSIONS['lz4'] = '.lz4' # speed mode: fast (de)compression, lower ratio
+
+    # Level used when the caller doesn't pick one (each library's own default)
+    DEFAULT_LEVELS = {'gzip': 9, 'zlib': 6, 'zstd': 3, 'lz4': 0}
+    # (fastest, smallest) levels each algorithm accepts; lz4 switches to its slower HC mode from 3
+    LEVEL_RANGES = {'gzip': (1, 9), 'zlib': (1, 9), 'zstd': (1, 22), 'lz4': (0, 16)}
+
+    # Files above this size default to zstd (when installed): better ratio at a fraction of the CPU
+    LARGE_FILE_SIZE = 16 * 1024 * 1024
+
+    def default_algorithm(self, size):
+        return 'zstd' if 'zstd' in self.EXTENSIONS and size > self.LARGE_FILE_SIZE else 'gzip'
+
     def __init__(self, metadata_file="compression_metadata.json"):
         self.metadata_file = metadata_file
+        # Changes since the last snapshot are appended here, one JSON record per line
+        self.journal_file = metadata_file + '.log'
+        self._journal = None
+        self._journal_records = 0
+        self._pending = [] # Records applied in memory but not yet written; see flush()
+        self.revision = 0 # Bumped on every change so views can skip redundant redraws
         self.metadata = self.load_metadata()
+        # A crash skips the exit-time compaction; don't carry a long journal into this session
+        if self._journal_too_long():
+            self.save_metadata()
+        atexit.register(self.compact)
+        self.listeners = [] # Callbacks run whenever the tracked files change
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def notify_listeners(self):
+        for callback in self.listeners:
+            callback()
 
     def load_metadata(self):
+        metadata = {}
         if os.path.exists(self.metadata_file):
             try:
-                with open(self.metadata_file, 'r') as f:
-                    return json.load(f)
+                with open(self.metadata_file, 'rb') as f:
+                    metadata = _json_loads(f.read())
             except json.JSONDecodeError:
                 messagebox.showwarning("Warning", "Metadata file is corrupted. Starting fresh.")
-        return {}
+        # Replay the journal on top of the snapshot
+        if os.path.exists(self.journal_file):
+            replayed = 0
+            with open(self.journal_file, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break # torn final record from an interrupted write
+                    try:
+                        record = _json_loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    self._apply(metadata, record)
+                    self._journal_records += 1
+                    replayed += len(line)
+            if replayed < os.path.getsize(self.journal_file):
+                # Cut the torn tail off, or the next append would be glued onto it and lost too
+                os.truncate(self.journal_file, replayed)
+        return metadata
+
+    @staticmethod
+    def _apply(metadata, record):
+        if record['op'] == 'add':
+            metadata[record['key']] = record['meta']
+        else:
+            metadata.pop(record['key'], None)
+
+    def _record(self, op, key, meta=None):
+        # Apply one change in memory; it reaches the journal on the next flush()
+        record = {'op': op, 'key': key, 'meta': meta}
+        self._apply(self.metadata, record)
+        self._pending.append(record)
+        self.revision += 1
+
+    def flush(self):
+        # Append every pending change to the journal in one write
+        if not self._pending:
+            return
+        try:
+            if self._journal is None:
+                self._journal = open(self.journal_file, 'ab')
+            self._journal.write(b''.join(_json_dumps(record) + b'\n' for record in self._pending))
+            self._journal.flush()
+            self._journal_records += len(self._pending)
+            self._pending.clear()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save metadata: {e}")
+            return
+        if self._journal_too_long():
+            self.save_metadata()
+
+    def _journal_too_long(self):
+        return self._journal_records > 2 * len(self.metadata)
+
+    def compact(self):
+        if self._journal_records or self._pending:
+            self.save_metadata()
 
     def save_metadata(self):
         try:
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
+            # Write a temp file and swap it in, so a crash can't leave a torn file
+            tmp_path = self.metadata_file + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(_json_dumps(self.metadata, indent=True))
+                # On disk before the rename, or a crash could publish an empty file
+                f.flush()
+                if hasattr(os, 'fdatasync'):
+                    os.fdatasync(f.fileno())
+                else:
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, self.metadata_file)
+            # The snapshot now holds everything the journal recorded
+            if self._journal is not None:
+                self._journal.truncate(0)
+            else:
+                try:
+                    os.truncate(self.journal_file, 0)
+                except FileNotFoundError:
+                    pass
+            self._journal_records = 0
+            self._pending.clear()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save metadata: {e}")
 
-    def compress_file(self, file_path, algorithm='gzip'):
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File {file_path} not found")
+    def prepare_compress(self, file_path, algorithm=None, level=None):
+        # One stat both proves the file exists and supplies the timestamps to restore
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File {file_path} not found") from None
         # Added more common system/config file extensions to avoid compression
-        if file_path.endswith(('.gz', '.zlib', '.sys', '.ini', '.dll', '.exe', '.log', '.tmp')):
+        ext = _ext_of(file_path)
+        if ext in _COMPRESSED_EXTS or ext in _SKIP_EXTS:
             raise ValueError("File is already compressed or is a system/temporary file that should not be compressed.")
 
-        st = os.stat(file_path)
+        # Sniff the content too: media and archives rarely shrink by more than 1%
+        with open(file_path, 'rb') as f:
+            head = f.read(16)
+        if head.startswith(_COMPRESSED_MAGIC) or head[4:8] == b'ftyp': # ftyp: MP4/MOV
+            raise ValueError("File content is already compressed (archive, image or video)")
+
+        if algorithm is None:
+            algorithm = self.default_algorithm(st.st_size)
+        if algorithm not in self.EXTENSIONS:
+            raise ValueError(f"Unsupported compression algorithm: {algorithm}")
+        if level is None:
+            level = self.DEFAULT_LEVELS[algorithm]
+        output_path = file_path + self.EXTENSIONS[algorithm]
+
         metadata = {
             'original_path': file_path,
+            'size': st.st_size,
             'atime': st.st_atime,
             'mtime': st.st_mtime,
-            'algorithm': algorithm
+            'algorithm': algorithm,
+            'level': level
         }
 
-        ext = '.gz' if algorithm == 'gzip' else '.zlib'
-        output_path = file_path + ext
-
-        if algorithm == 'gzip':
-            with open(file_path, 'rb') as f_in, gzip.open(output_path, 'wb') as f_out:
-                shutil.copyfileobj(f_in, f_out)
-        else: # zlib
-            with open(file_path, 'rb') as f_in, open(output_path, 'wb') as f_out:
-                f_out.write(zlib.compress(f_in.read()))
-
-        if not os.path.exists(output_path):
-            raise RuntimeError("Compression failed: output file not created")
+        return output_path, metadata
 
-        self.metadata[output_path] = metadata
-        self.save_metadata()
+    def commit_compress(self, output_path, metadata):
+        self._record('add', output_path, metadata)
+        self.notify_listeners()
         return output_path
 
+    def compress_file(self, file_path, algorithm=None, level=None):
+        output_path, metadata = self.prepare_compress(file_path, algorithm, level)
+        _compress_stream(file_path, output_path, metadata['algorithm'], metadata['level'], metadata['size'])
+        return self.commit_compress(output_path, metadata)
+
     def decompress_file(self, compressed_path):
         if compressed_path not in self.metadata:
             raise ValueError("No metadata found for file")
@@ -83,23 +322,53 @@ class FileCompressor:
             if not overwrite:
                 return # Stop decompression if user chooses not to overwrite
 
-        if algorithm == 'gzip':
-            with gzip.open(compressed_path, 'rb') as f_in, open(original_path, 'wb') as f_out:
-                shutil.copyfileobj(f_in, f_out)
-        else: # zlib
+        if algorithm == 'gzip' and _PIGZ and os.path.getsize(compressed_path) > PIGZ_MIN_SIZE:
+            with open(original_path, 'wb') as f_out:
+                subprocess.run([_PIGZ, '-d', '-c', compressed_path], stdout=f_out, check=True)
+        elif algorithm == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("Decompressing zstd files requires the 'zstandard' package")
             with open(compressed_path, 'rb') as f_in, open(original_path, 'wb') as f_out:
-                f_out.write(zlib.decompress(f_in.read()))
-
+                zstandard.ZstdDecompressor().copy_stream(f_in, f_out, read_size=self.COPY_BUFSIZE, write_size=self.COPY_BUFSIZE)
+        elif algorithm == 'lz4':
+            if lz4_frame is None:
+                raise RuntimeError("Decompressing lz4 files requires the 'lz4' package")
+            with lz4_frame.open(compressed_path, 'rb') as f_in, open(original_path, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out, length=self.COPY_BUFSIZE)
+        else: # gzip or zlib
+            wbits = 31 if algorithm == 'gzip' else zlib.MAX_WBITS
+            do = inflate.decompressobj(wbits)
+            with open(compressed_path, 'rb') as f_in, open(original_path, 'wb') as f_out:
+                while chunk := f_in.read(self.COPY_BUFSIZE):
+                    while chunk:
+                        if do.eof and algorithm == 'gzip':
+                            # A gzip file may hold several members back to back, and may be padded
+                            # with NUL bytes (tape and dd output often are), which gzip skips
+                            chunk = chunk.lstrip(b'\0')
+                            if not chunk:
+                                break
+                            do = inflate.decompressobj(wbits)
+                        out = do.decompress(chunk)
+                        if out:
+                            f_out.write(out)
+                        chunk = do.unused_data if do.eof and algorithm == 'gzip' else b''
+                f_out.write(do.flush())
+            if not do.eof:
+                raise RuntimeError("Decompression failed: compressed data is truncated")
+
+        # A short or oversized result (disk full, wrong data) shows up as a size mismatch
+        expected_size = meta.get('size')
+        if expected_size is not None:
+            actual_size = os.path.getsize(original_path)
+            if actual_size != expected_size:
+                raise RuntimeError(f"Decompression failed: expected {expected_size} bytes, got {actual_size}")
         os.utime(original_path, (meta['atime'], meta['mtime']))
 
-        if not os.path.exists(original_path):
-            raise RuntimeError("Decompression failed: output file not created")
-
         # After successful decompression, remove the compressed file and its metadata
         try:
             os.remove(compressed_path)
-            del self.metadata[compressed_path]
-            self.save_metadata()
+            self._record('del', compressed_path)
+            self.notify_listeners()
         except Exception as e:
             messagebox.showwarning("Cleanup Warning", f"Successfully decompressed, but failed to clean up compressed file or metadata: {e}")
 
@@ -110,9 +379,24 @@ class CompressorGUI:
         self.root = root
         self.root.title("File Compressor")
         self.compressor = FileCompressor()
+        self.compressor.add_listener(self.on_metadata_change)
+        self._refresh_pending = False
+        self._flush_job = None
+        self._disk_cache = (0.0, None) # (monotonic time, psutil disk usage)
+        self._shown_rows = {} # iid -> (values, tag) currently in the tree, in display order
+        self._rendered_revision = None # metadata revision the file list was last built from
+        # Auto-compression runs in worker processes so deflate neither blocks Tk nor holds the GIL;
+        # started by _compress_pool() on first use
+        self._pool = None
+        self._probe_pool = None # threads for the auto-compress existence checks; see _probe_exists()
+        self._auto_jobs = {} # original path -> (future, output path, metadata)
+        self._stat_cache = {} # directory -> (mtime_ns, names scanned, {name: size})
+        self._log_queue = deque()
+        self._log_drain_scheduled = False
         self.root.geometry("750x500")
         self.root.minsize(750, 400) # Set a minimum size for the window
         self.setup_gui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.refresh()
         # Start the automatic disk usage check loop
         self.auto_check_disk_usage()
@@ -192,7 +476,7 @@ class CompressorGUI:
 
         self.compress_btn = ttk.Button(btn_frame, text="Compress File", command=self.compress_file)
         self.decompress_btn = ttk.Button(btn_frame, text="Decompress File", command=self.decompress_file)
-        self.refresh_btn = ttk.Button(btn_frame, text="Refresh", command=self.refresh)
+        self.refresh_btn = ttk.Button(btn_frame, text="Refresh", command=lambda: self.refresh(force=True))
 
         # Pack buttons without 'expand=True' in the button frame
         # They will take their natural size and be placed side-by-side
@@ -245,20 +529,64 @@ class CompressorGUI:
 
 
     def log(self, message):
-        self.status_label.config(text=f"Status: {message}")
+        # Queue the message; bursts are drained in batches so the status label
+        # is reconfigured once per batch instead of once per line
+        self._log_queue.append(message)
+        if not self._log_drain_scheduled:
+            self._log_drain_scheduled = True
+            self.root.after(LOG_DRAIN_INTERVAL_MS, self._drain_log)
+
+    def _drain_log(self):
+        batch = [self._log_queue.popleft() for _ in range(min(LOG_DRAIN_BATCH, len(self._log_queue)))]
+        self.status_label.config(text=f"Status: {batch[-1]}")
         # Also print to console for debugging
-        print(message)
+        print("\n".join(batch))
+        if self._log_queue:
+            self.root.after(LOG_DRAIN_INTERVAL_MS, self._drain_log)
+        else:
+            self._log_drain_scheduled = False
 
-    def refresh(self):
+    def refresh(self, force=False):
+        if force:
+            self._stat_cache.clear() # files may have changed on disk without a metadata change
         self.update_disk_usage()
-        self.update_file_list()
+        self.update_file_list(force)
+
+    def on_metadata_change(self):
+        # Files may have been rewritten in place, so cached sizes can't be trusted
+        self._stat_cache.clear()
+        self._disk_cache = (0.0, None)
+        # Coalesce bursts of changes (e.g. auto-compression) into one refresh
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.root.after_idle(self._run_pending_refresh)
+        # Likewise batch metadata writes: changes within the delay share one journal write
+        if self._flush_job is None:
+            self._flush_job = self.root.after(METADATA_FLUSH_DELAY_MS, self._flush_metadata)
+
+    def _run_pending_refresh(self):
+        self._refresh_pending = False
+        self.refresh()
 
-    def update_disk_usage(self):
-        try:
+    def _flush_metadata(self):
+        self._flush_job = None
+        self.compressor.flush()
+
+    def get_disk_usage(self):
+        checked_at, disk = self._disk_cache
+        now = time.monotonic()
+        if disk is None or now - checked_at >= DISK_USAGE_TTL:
             # Get the drive where the script is running (or a specific drive, e.g., 'C:')
             # For cross-platform, os.path.abspath(os.sep) gets the root of the current drive on Windows
             # and '/' on Unix-like systems.
             disk = psutil.disk_usage(os.path.abspath(os.sep))
+            self._disk_cache = (now, disk)
+        return disk
+
+    def update_disk_usage(self, disk=None):
+        try:
+            if disk is None:
+                disk = self.get_disk_usage()
             used_gb = disk.used / (1024**3)
             total_gb = disk.total / (1024**3)
             pct = (used_gb / total_gb) * 100 if total_gb else 0
@@ -269,42 +597,115 @@ class CompressorGUI:
             self.log(f"Error getting disk usage: {e}")
 
 
-    def update_file_list(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def get_file_sizes(self, paths):
+        # One scandir per directory instead of an exists + getsize pair per row.
+        # Results are cached per directory and reused while its mtime is unchanged.
+        by_dir = {}
+        for path in paths:
+            by_dir.setdefault(os.path.dirname(path), []).append(path)
+        sizes = {}
+        for directory, dir_paths in by_dir.items():
+            wanted = {os.path.basename(p) for p in dir_paths}
+            try:
+                mtime = os.stat(directory or '.').st_mtime_ns
+                cached = self._stat_cache.get(directory)
+                if cached is None or cached[0] != mtime or not wanted <= cached[1]:
+                    with os.scandir(directory or '.') as it:
+                        entry_sizes = {e.name: e.stat().st_size for e in it if e.name in wanted and e.is_file()}
+                    cached = self._stat_cache[directory] = (mtime, wanted, entry_sizes)
+            except OSError:
+                cached = (None, wanted, {})
+            for path in dir_paths:
+                sizes[path] = cached[2].get(os.path.basename(path), 0)
+        return sizes
+
+    def update_file_list(self, force=False):
+        if not force and self._rendered_revision == self.compressor.revision:
+            return
+        self._rendered_revision = self.compressor.revision
+        rows = []
         if not self.compressor.metadata:
             self.placeholder.lift() # Show placeholder if no files
         else:
             self.placeholder.lower() # Hide placeholder if files exist
-            idx = 0
             # Sort metadata by original path for consistent display
             sorted_metadata_items = sorted(self.compressor.metadata.items(), key=lambda item: item[0].lower())
-            for path, meta in sorted_metadata_items:
-                size = os.path.getsize(path) if os.path.exists(path) else 0
-                tag = 'evenrow' if idx % 2 == 0 else 'oddrow'
-                self.tree.insert('', 'end', iid=path, # Use path as iid for easy lookup
-                                 values=(os.path.basename(path), size, meta['algorithm']),
-                                 tags=(tag,))
-                idx += 1
+            sizes = self.get_file_sizes(self.compressor.metadata)
+            # Paths double as iids for easy lookup
+            rows = [(path, (os.path.basename(path), sizes[path], meta['algorithm']), 'evenrow' if idx % 2 == 0 else 'oddrow')
+                    for idx, (path, meta) in enumerate(sorted_metadata_items)]
+        self._show_rows(rows)
+
+    def _show_rows(self, rows):
+        # Diff against what is on screen so only new, changed and removed rows touch Tk
+        shown = self._shown_rows
+        wanted = {path: (values, tag) for path, values, tag in rows}
+        if shown and [p for p in shown if p in wanted] == [path for path, _, _ in rows if path in shown]:
+            stale = [p for p in shown if p not in wanted]
+            if stale:
+                self.tree.delete(*stale)
+            for idx, (path, values, tag) in enumerate(rows):
+                if path not in shown:
+                    self.tree.insert('', idx, iid=path, values=values, tags=(tag,))
+                elif shown[path] != (values, tag):
+                    self.tree.item(path, values=values, tags=(tag,))
+        else:
+            # First fill or a reorder: rebuild, with the columns hidden so Tk lays the view out once
+            children = self.tree.get_children()
+            if children:
+                self.tree.delete(*children)
+            self.tree.configure(displaycolumns=())
+            try:
+                for path, values, tag in rows:
+                    self.tree.insert('', 'end', iid=path, values=values, tags=(tag,))
+            finally:
+                self.tree.configure(displaycolumns='#all')
+        self._shown_rows = wanted
 
     def compress_file(self):
         path = filedialog.askopenfilename()
         if not path:
             return # User cancelled
 
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0 # gone already; compress_file below reports it
+
         # Prompt for algorithm choice
-        use_gzip = messagebox.askyesno(
+        choices = ", ".join(self.compressor.EXTENSIONS)
+        alg = simpledialog.askstring(
             "Compression Algorithm",
-            "Do you want to use GZIP for compression? (Yes for GZIP, No for ZLIB)"
+            f"Which algorithm should be used? ({choices})",
+            initialvalue=self.compressor.default_algorithm(size),
+            parent=self.root
+        )
+        if not alg:
+            return # User cancelled
+        alg = alg.strip().lower()
+        if alg not in self.compressor.EXTENSIONS:
+            messagebox.showwarning("Warning", f"Unsupported compression algorithm: {alg}")
+            self.log(f"Compression warning: Unsupported compression algorithm: {alg}")
+            return
+
+        # Speed/ratio trade-off: low levels encode fast, high levels give smaller files
+        low, high = self.compressor.LEVEL_RANGES[alg]
+        level = simpledialog.askinteger(
+            "Compression Level",
+            f"Compression level ({low} = fastest, {high} = smallest output)",
+            minvalue=low,
+            maxvalue=high,
+            initialvalue=self.compressor.DEFAULT_LEVELS[alg],
+            parent=self.root
         )
-        alg = 'gzip' if use_gzip else 'zlib'
+        if level is None:
+            return # User cancelled
 
         try:
             self.log(f"Compressing {os.path.basename(path)}...")
-            out = self.compressor.compress_file(path, alg)
+            out = self.compressor.compress_file(path, alg, level)
             messagebox.showinfo("Success", f"File compressed successfully to:\n{out}")
             self.log(f"Successfully compressed file: {os.path.basename(out)}")
-            self.refresh()
         except ValueError as ve:
             messagebox.showwarning("Warning", str(ve))
             self.log(f"Compression warning: {ve}")
@@ -333,7 +734,6 @@ class CompressorGUI:
             orig = self.compressor.decompress_file(comp_path_to_decompress)
             messagebox.showinfo("Success", f"File decompressed successfully to:\n{orig}")
             self.log(f"Successfully decompressed file: {os.path.basename(orig)}")
-            self.refresh()
         except ValueError as ve:
             messagebox.showwarning("Warning", str(ve))
             self.log(f"Decompression warning: {ve}")
@@ -350,38 +750,46 @@ class CompressorGUI:
     def auto_check_disk_usage(self):
         # This function runs periodically to check disk usage and potentially auto-compress
         try:
-            disk = psutil.disk_usage(os.path.abspath(os.sep))
+            disk = self.get_disk_usage()
             pct_used = disk.percent
             threshold = 85.0  # percent usage to trigger auto-compression
 
-            # Update the disk usage display
-            self.update_disk_usage()
+            # Update the disk usage display from the same reading
+            self.update_disk_usage(disk)
 
             if pct_used >= threshold:
                 self.log(f"Disk usage is {pct_used:.1f}%, at or above threshold ({threshold:.1f}%). Checking for files to auto-compress...")
-                compressed_something = False
+                polling = bool(self._auto_jobs)
+                queued = 0
                 # Iterate through existing metadata to find original files that are NOT yet compressed
                 # and are still present on disk.
-                # Use list(self.compressor.metadata.items()) to iterate over a copy,
-                # as the dictionary might change during compression.
-                for compressed_file_path, meta in list(self.compressor.metadata.items()):
+                # Snapshot just the keys, as the dictionary might change during compression.
+                metadata = self.compressor.metadata
+                compressed_paths = list(metadata)
+
+                # Probe every original/compressed path up front
+                paths = [p for comp in compressed_paths for p in (metadata[comp]['original_path'], comp)]
+                exists = self._probe_exists(paths)
+
+                for compressed_file_path in compressed_paths:
+                    meta = metadata[compressed_file_path]
                     original_file_path = meta['original_path']
 
                     # Check if the original file exists and the *compressed* version doesn't
                     # (meaning it was decompressed or never compressed after initial metadata saving)
-                    if os.path.exists(original_file_path) and not os.path.exists(compressed_file_path):
-                        # Ensure we don't compress system/program files
-                        if not original_file_path.endswith(('.sys', '.ini', '.dll', '.exe', '.log', '.tmp')):
+                    if exists[original_file_path] and not exists[compressed_file_path]:
+                        # Ensure we don't compress system/program files, or one a worker already has
+                        if _ext_of(original_file_path) not in _SKIP_EXTS and original_file_path not in self._auto_jobs:
                             try:
                                 self.log(f"Attempting to auto-compress: {os.path.basename(original_file_path)}")
-                                out = self.compressor.compress_file(original_file_path, meta['algorithm'])
-                                self.log(f"Auto compressed: {os.path.basename(out)}")
-                                compressed_something = True
-                                # Optional: remove original file after successful auto-compression
-                                # os.remove(original_file_path)
+                                output_path, new_meta = self.compressor.prepare_compress(original_file_path, meta['algorithm'], meta.get('level'))
+                                # One thread per job: the pool already runs a job per core
+                                future = self._compress_pool().submit(_compress_stream, original_file_path, output_path, new_meta['algorithm'], new_meta['level'], new_meta['size'], 1)
+                                self._auto_jobs[original_file_path] = (future, output_path, new_meta)
+                                queued += 1
                             except Exception as e:
                                 self.log(f"Auto compression error for {os.path.basename(original_file_path)}: {e}")
-                    elif os.path.exists(compressed_file_path):
+                    elif exists[compressed_file_path]:
                         # If the compressed file already exists, it's fine.
                         pass
                     else:
@@ -390,9 +798,10 @@ class CompressorGUI:
                         self.log(f"Warning: Neither original '{os.path.basename(original_file_path)}' nor compressed '{os.path.basename(compressed_file_path)}' found for metadata entry. Metadata might be stale.")
                         # This could be handled by a periodic metadata cleanup function.
 
-                if compressed_something:
-                    self.log("Auto-compression completed. Refreshing file list.")
-                    self.refresh()
+                if queued:
+                    self.log(f"Queued {queued} file(s) for auto-compression.")
+                    if not polling:
+                        self.root.after(AUTO_JOB_POLL_MS, self._collect_auto_jobs)
                 else:
                     self.log("Disk usage high, but no eligible files found for auto-compression.")
             else:
@@ -401,8 +810,52 @@ class CompressorGUI:
         except Exception as e:
             self.log(f"Auto check disk usage error: {e}")
 
-        # Schedule the next check
-        self.root.after(10000, self.auto_check_disk_usage) # Check every 10 seconds (10000 ms)
+        # Schedule the next check. File list changes are pushed through on_metadata_change,
+        # but this tick is still what starts auto-compression once the disk fills up.
+        self.root.after(AUTO_CHECK_INTERVAL_MS, self.auto_check_disk_usage)
+
+    def _probe_exists(self, paths):
+        if len(paths) <= PROBE_INLINE_MAX:
+            return {path: os.path.exists(path) for path in paths}
+        # os.path.exists releases the GIL, so on a thread pool the stat calls overlap.
+        # The pool is kept for later ticks rather than rebuilt each time
+        if self._probe_pool is None:
+            self._probe_pool = ThreadPoolExecutor(max_workers=16)
+        return dict(zip(paths, self._probe_pool.map(os.path.exists, paths)))
+
+    def _compress_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+        return self._pool
+
+    def on_close(self):
+        if self._pool is not None:
+            # Let running jobs finish so no half-written output is left behind; queued ones are dropped
+            self._pool.shutdown(cancel_futures=True)
+            self._auto_jobs = {path: job for path, job in self._auto_jobs.items() if not job[0].cancelled()}
+            self._collect_auto_jobs()
+        if self._probe_pool is not None:
+            self._probe_pool.shutdown()
+        self.root.destroy()
+
+    def _collect_auto_jobs(self):
+        # Metadata is only touched here, on the Tk thread, once a worker has finished
+        for original_file_path, (future, output_path, meta) in list(self._auto_jobs.items()):
+            if not future.done():
+                continue
+            del self._auto_jobs[original_file_path]
+            try:
+                future.result()
+                self.compressor.commit_compress(output_path, meta)
+                self.log(f"Auto compressed: {os.path.basename(output_path)}")
+                # Optional: remove original file after successful auto-compression
+                # os.remove(original_file_path)
+            except Exception as e:
+                self.log(f"Auto compression error for {os.path.basename(original_file_path)}: {e}")
+        if self._auto_jobs:
+            self.root.after(AUTO_JOB_POLL_MS, self._collect_auto_jobs)
+        else:
+            self.log("Auto-compression completed.")
 
 
 if __name__ == "__main__":
@@ -1,70 +1,149 @@
 import os
 import shutil
-import psutil
+import subprocess
 import time
-import gzip
 import logging
+import logging.handlers
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 
+from tanisha_module import iter_file_stats, prioritize_files
+
+try:
+    import psutil
+except ImportError:  # only needed where os.statvfs is missing (Windows)
+    psutil = None
+
+try:
+    # zlib-ng's drop-in gzip module: same API, levels and file format, SIMD-accelerated deflate
+    from zlib_ng import gzip_ng as gzip
+except ImportError:
+    import gzip
+
 
 WATCH_DIRECTORY = "/Users/manpreetwalia/Desktop/TestFiles"
 DISK_PATH = "/"
 THRESHOLD_PERCENT = 99  
+MIN_POLL_SECONDS = 5  # poll this often when free space is at or near the threshold
+MAX_POLL_SECONDS = 300  # and back off to this when there is plenty of headroom
+CYCLE_INTERVAL_SECONDS = 60  # minimum gap between compression cycles; only the free-space probe runs sooner
 LOG_FILE = "smartcompress.log"
+COPY_BUFSIZE = 1024 * 1024  # 1 MiB per read/write instead of copyfileobj's 64 KiB default
+PIGZ_MIN_SIZE = 16 * 1024 * 1024  # larger files are handed to pigz when it is installed
+PIGZ = shutil.which('pigz')  # multi-threaded gzip, same output format
+CPU_COUNT = os.cpu_count() or 1
+COMPRESS_WORKERS = min(4, CPU_COUNT)  # files compressed at once by compress_files
+PIGZ_THREADS = max(1, CPU_COUNT // COMPRESS_WORKERS)  # each pooled job's share of the cores
+LOG_MAX_BYTES = 10 * 1024 * 1024  # rotate the log at this size, keeping LOG_BACKUPS old files
+LOG_BACKUPS = 3
 
 
-logging.basicConfig(filename=LOG_FILE, level=logging.INFO, format='%(asctime)s - %(message)s')
+_log_file = logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS)
+_log_file.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+# Records are written in batches; errors, a full buffer or the end of a cycle flush it
+_log_buffer = logging.handlers.MemoryHandler(64, flushLevel=logging.ERROR, target=_log_file)
+logging.basicConfig(level=logging.INFO, handlers=[_log_buffer])
 
 def get_disk_free_percent(path):
+    if hasattr(os, 'statvfs'):
+        # One direct libc call; the same free/total figures psutil reports on POSIX
+        st = os.statvfs(path)
+        return st.f_bavail * 100.0 / st.f_blocks
     usage = psutil.disk_usage(path)
     return usage.free / usage.total * 100
 
-def should_compress(path):
+def next_poll_seconds(free_percent):
+    # Each point of free space above the threshold buys six more seconds between checks
+    headroom = free_percent - THRESHOLD_PERCENT
+    return min(MAX_POLL_SECONDS, max(MIN_POLL_SECONDS, headroom * 6))
+
+def _gzip_file(path, pigz_threads=PIGZ_THREADS):
+    # Runs in worker processes: only writes the .gz, logging and removal stay in the parent.
+    # Output goes to a temp file that is synced and renamed into place: a .gz only ever exists
+    # complete and on disk, so removing the original afterwards can't lose data
+    gz_path = path + '.gz'
+    tmp_path = gz_path + '.tmp'
     try:
-       
-        return os.path.isfile(path) and not path.endswith('.gz')
-    except Exception as e:
-        logging.error(f"Error checking file: {path} - {e}")
-        return False
+        with open(tmp_path, 'wb') as raw_out:
+            if PIGZ and os.path.getsize(path) > PIGZ_MIN_SIZE:
+                # -9 matches gzip.open's default level, so the choice of tool doesn't change the ratio
+                subprocess.run([PIGZ, '-9', '-p', str(pigz_threads), '-c', path], stdout=raw_out, check=True)
+            else:
+                with open(path, 'rb', buffering=COPY_BUFSIZE) as f_in:
+                    # The original is read once, front to back, and then deleted: ask for aggressive
+                    # readahead, then drop its pages so they don't push hotter data out of the cache
+                    if hasattr(os, 'posix_fadvise'):
+                        os.posix_fadvise(f_in.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                    # gz_path only names the header; the bytes go to raw_out
+                    with gzip.GzipFile(gz_path, 'wb', fileobj=raw_out) as f_out:
+                        shutil.copyfileobj(f_in, f_out, length=COPY_BUFSIZE)
+                    if hasattr(os, 'posix_fadvise'):
+                        os.posix_fadvise(f_in.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+            raw_out.flush()
+            os.fsync(raw_out.fileno())
+        os.replace(tmp_path, gz_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
 
 def compress_file(path):
     try:
-        with open(path, 'rb') as f_in:
-            with gzip.open(path + '.gz', 'wb') as f_out:
-                shutil.copyfileobj(f_in, f_out)
+        # Runs alone, so pigz may use every core
+        _gzip_file(path, CPU_COUNT)
         os.remove(path)
         logging.info(f"Compressed: {path}")
     except Exception as e:
         logging.error(f"Compression failed for {path}: {e}")
 
+_pool = None
+
+def _compress_pool():
+    # Started on first use and kept for later cycles; the workers exit with the process
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=COMPRESS_WORKERS)
+    return _pool
+
+def compress_files(paths):
+    # Deflate is CPU-bound, so compress several files at once; workers times
+    # PIGZ_THREADS stays within the core count
+    pool = _compress_pool()
+    futures = {pool.submit(_gzip_file, path): path for path in paths}
+    for future in as_completed(futures):
+        path = futures[future]
+        try:
+            future.result()
+            os.remove(path)
+            logging.info(f"Compressed: {path}")
+        except Exception as e:
+            logging.error(f"Compression failed for {path}: {e}")
+
 def find_files_to_compress(directory, limit=10):
-    all_files = []
-    for root, _, files in os.walk(directory):
-        for file in files:
-            full_path = os.path.join(root, file)
-            if should_compress(full_path):
-                last_access = os.path.getatime(full_path)
-                size = os.path.getsize(full_path)
-                all_files.append((full_path, last_access, size))
-    
-   
-    all_files.sort(key=lambda x: (x[1], -x[2]))
-    return [file[0] for file in all_files[:limit]]
+    # Same scan and ranking as tanisha_module: scandir walk, least recently used first.
+    # Streamed into the bounded heap; threaded subtrees send back only their own top `limit`
+    return prioritize_files(iter_file_stats(directory, limit), limit)
 
 def monitor_and_compress():
     while True:
         free_percent = get_disk_free_percent(DISK_PATH)
         print(f"Free space: {free_percent:.2f}%")
+        delay = next_poll_seconds(free_percent)
         
         if free_percent < THRESHOLD_PERCENT:
             logging.warning("Low disk space! Starting compression cycle.")
             files = find_files_to_compress(WATCH_DIRECTORY)
             if files:
-                for file_path in files:
-                    compress_file(file_path)
+                compress_files(files)
+                # The short poll is for the statvfs probe; a scan and batch run at most this often
+                delay = max(delay, CYCLE_INTERVAL_SECONDS)
             else:
                 logging.info("No eligible files to compress.")
-        time.sleep(60)  
+                delay = MAX_POLL_SECONDS  # rescanning soon would find nothing new
+        _log_buffer.flush()
+        time.sleep(delay)
 
 if __name__ == "__main__":
     monitor_and_compress()
@@ -1,22 +1,43 @@
 import os
 import json
+import heapq
+import atexit
 import logging
+import logging.handlers
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; the stdlib encoder is used without it
+    orjson = None
 
 # --- Configuration ---
 WATCH_DIRECTORY = "/Users/tanishachauhan/Downloads/TestFiles"  
 LOG_FILE = "smartcompress.log"
+LOG_MAX_BYTES = 10 * 1024 * 1024  # rotate the log at this size, keeping LOG_BACKUPS old files
+LOG_BACKUPS = 3
 METADATA_FILE = "metadata.json"
+METADATA_LOG = "metadata.log"
+COMPACT_THRESHOLD = 1024 * 1024  # bytes of log before it is folded into the snapshot
+GROUP_COMMIT_SIZE = 8  # metadata records queued before they are written to the log
 PRIORITY_LIMIT = 10
+SCAN_WORKERS = 8  # threads walking top-level subdirectories in parallel
+PARALLEL_MIN_SUBDIRS = 5  # fewer top-level subdirectories are walked on the calling thread
+SKIP_EXTENSIONS = frozenset({".gz"})  # never offered for compression
+PARTIAL_SUFFIX = ".gz.tmp"  # smartcompress's in-progress output; a crashed run can leave one behind
 
 
 # ---  Logging ---
 def setup_logger():
+    file_handler = logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS)
+    file_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    # Batch writes; errors and a full buffer flush early, logging.shutdown() flushes at exit
     logging.basicConfig(
-        filename=LOG_FILE,
         level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s"
+        handlers=[logging.handlers.MemoryHandler(64, flushLevel=logging.ERROR, target=file_handler)]
     )
 
 
@@ -29,47 +50,254 @@ def log_error(message: str):
 
 
 # --- File Prioritization ---
+def _extension(name: str) -> str:
+    # The suffix from the last dot, taken without splitext()'s overhead. Unlike splitext, a
+    # name that is only an extension counts too: a file called ".gz" is still gzip output
+    dot = name.rfind(".")
+    return name[dot:].lower() if dot >= 0 else ""
+
+
+def _scan_dir(directory: str) -> Tuple[List[str], List[os.DirEntry]]:
+    # scandir hands back the file type with each name, and one stat per entry
+    # is cached on the DirEntry, so no separate isfile/getatime/getsize calls
+    subdirs, files = [], []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                # The name check is free, and with follow_symlinks=False is_file() answers from
+                # the dirent type; symlinks are skipped since compressing one frees nothing
+                elif (_extension(entry.name) not in SKIP_EXTENSIONS and not entry.name.endswith(PARTIAL_SUFFIX)
+                      and entry.is_file(follow_symlinks=False)):
+                    files.append(entry)
+    except OSError as e:
+        log_error(f"Error scanning directory: {directory} - {e}")
+    return subdirs, files
+
+
+def _walk_files(directory: str) -> Iterator[os.DirEntry]:
+    # An explicit stack instead of recursion: no generator chain per level, no depth limit
+    pending = [directory]
+    while pending:
+        subdirs, files = _scan_dir(pending.pop())
+        yield from files
+        pending.extend(subdirs)
+
+
+def _iter_stats(entries: Iterable[os.DirEntry]) -> Iterator[Tuple[str, float, int]]:
+    for entry in entries:
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except Exception as e:
+            log_error(f"Error reading file: {entry.path} - {e}")
+            continue
+        yield (entry.path, st.st_atime, st.st_size)
+
+
+def _priority_key(file_stat: Tuple[str, float, int]) -> Tuple[float, int]:
+    # Least recently accessed first, larger files first among equals
+    return (file_stat[1], -file_stat[2])
+
+
+def _subtree_stats(directory: str, limit: Optional[int] = None) -> List[Tuple[str, float, int]]:
+    file_stats = _iter_stats(_walk_files(directory))
+    if limit is None:
+        return list(file_stats)
+    # The global top `limit` can only contain a subtree's own top `limit`
+    return heapq.nsmallest(limit, file_stats, key=_priority_key)
+
+
+def iter_file_stats(directory: str, limit: Optional[int] = None) -> Iterator[Tuple[str, float, int]]:
+    # Yields as the walk goes. Threaded subtrees come back as whole lists, so with a
+    # `limit` each is cut down to its own best `limit` in the worker: a top-K consumer
+    # then holds at most `limit` per top-level subdirectory, not the whole tree
+    subdirs, files = _scan_dir(directory)
+    yield from _iter_stats(files)
+    if len(subdirs) < PARALLEL_MIN_SUBDIRS:
+        # Too little to split up: starting the pool would cost more than it saves
+        for subdir in subdirs:
+            yield from _iter_stats(_walk_files(subdir))
+        return
+    # Each top-level subtree is walked on its own thread; scandir and stat release the GIL
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+        for subtree_stats in pool.map(_subtree_stats, subdirs, [limit] * len(subdirs)):
+            yield from subtree_stats
+
+
 def get_file_stats(directory: str) -> List[Tuple[str, float, int]]:
-    file_stats = []
-    for root, _, files in os.walk(directory):
-        for name in files:
-            path = os.path.join(root, name)
-            if os.path.isfile(path) and not path.endswith('.gz'):
-                try:
-                    access_time = os.path.getatime(path)
-                    size = os.path.getsize(path)
-                    file_stats.append((path, access_time, size))
-                except Exception as e:
-                    log_error(f"Error reading file: {path} - {e}")
-    return file_stats
+    return list(iter_file_stats(directory))
 
 
-def prioritize_files(file_stats: List[Tuple[str, float, int]], limit: int = 10) -> List[str]:
-    sorted_files = sorted(file_stats, key=lambda x: (x[1], -x[2]))
-    return [entry[0] for entry in sorted_files[:limit]]
+def prioritize_files(file_stats: Iterable[Tuple[str, float, int]], limit: int = 10) -> List[str]:
+    # Only the top `limit` are needed: a bounded heap is O(n log k) instead of a full sort
+    top_files = heapq.nsmallest(limit, file_stats, key=_priority_key)
+    return [entry[0] for entry in top_files]
 
 
 # --- Metadata Management ---
+# METADATA_FILE holds a snapshot and METADATA_LOG one JSON record per change made
+# since. Loading replays the log over the snapshot; once the log outgrows the
+# snapshot it is folded back in by compact_metadata().
+_metadata_cache = None
+_metadata_stamp = None
+_journal = None
+_pending = []
+_batch_depth = 0
+
+
+# Built once: json.dumps constructs a fresh encoder for any non-default option like indent
+_PRETTY_ENCODER = json.JSONEncoder(indent=4)
+_COMPACT_ENCODER = json.JSONEncoder()
+
+
+def _json_dumps(obj, indent: bool = False) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return (_PRETTY_ENCODER if indent else _COMPACT_ENCODER).encode(obj).encode()
+
+
+def _json_loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _file_stamp(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _metadata_stamps():
+    return (_file_stamp(METADATA_FILE), _file_stamp(METADATA_LOG))
+
+
+def _apply_op(data, record):
+    if record["op"] == "mark":
+        data[record["path"]] = record["entry"]
+
+
 def load_metadata():
-    if not os.path.exists(METADATA_FILE):
-        return {}
-    with open(METADATA_FILE, "r") as f:
-        return json.load(f)
+    global _metadata_cache, _metadata_stamp
+    stamp = _metadata_stamps()
+    if _metadata_cache is not None and stamp == _metadata_stamp:
+        return _metadata_cache
+    data = {}
+    if stamp[0] is not None:
+        with open(METADATA_FILE, "rb") as f:
+            data = _json_loads(f.read())
+    if stamp[1] is not None:
+        replayed = 0
+        with open(METADATA_LOG, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn final record from an interrupted write
+                try:
+                    record = _json_loads(line)
+                except json.JSONDecodeError:
+                    break
+                _apply_op(data, record)
+                replayed += len(line)
+        if replayed < stamp[1][1]:
+            # Cut the torn tail off, or the next append would be glued onto it and lost too
+            os.truncate(METADATA_LOG, replayed)
+            stamp = _metadata_stamps()
+    for record in _pending:
+        _apply_op(data, record)
+    _metadata_cache = data
+    _metadata_stamp = stamp
+    return data
 
 
 def save_metadata(data):
-    with open(METADATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    global _metadata_cache, _metadata_stamp
+    try:
+        # Write a temp file and swap it in, so a crash never leaves a torn snapshot
+        tmp_path = METADATA_FILE + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_json_dumps(data, indent=True))
+            f.flush()
+            if hasattr(os, "fdatasync"):
+                os.fdatasync(f.fileno())
+            else:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, METADATA_FILE)
+        # The snapshot now contains everything the log recorded or still had queued
+        try:
+            os.truncate(METADATA_LOG, 0)
+        except FileNotFoundError:
+            pass
+    except Exception:
+        _metadata_cache = _metadata_stamp = None
+        raise
+    _pending.clear()
+    _metadata_cache = data
+    _metadata_stamp = _metadata_stamps()
+
+
+def compact_metadata():
+    save_metadata(load_metadata())
+
+
+def flush_metadata():
+    global _journal, _metadata_cache, _metadata_stamp
+    if not _pending:
+        return
+    try:
+        if _journal is None:
+            # Kept open (unbuffered) for the life of the process; closed at exit
+            _journal = open(METADATA_LOG, "ab", buffering=0)
+        payload = memoryview(b"".join(_json_dumps(record) + b"\n" for record in _pending))
+        while payload:
+            payload = payload[os.write(_journal.fileno(), payload):]
+    except Exception:
+        _metadata_cache = _metadata_stamp = None
+        raise
+    _pending.clear()
+    _metadata_stamp = _metadata_stamps()
+    snapshot_size = _metadata_stamp[0][1] if _metadata_stamp[0] else 0
+    if _metadata_stamp[1][1] > max(snapshot_size, COMPACT_THRESHOLD):
+        compact_metadata()
+
+
+def _append_op(record):
+    # Records are group-committed: written out together once enough have queued up
+    _pending.append(record)
+    if not _batch_depth and len(_pending) >= GROUP_COMMIT_SIZE:
+        flush_metadata()
+
+
+@contextmanager
+def metadata_batch():
+    # Hold every record made inside the block and write them in one go when it exits
+    global _batch_depth
+    _batch_depth += 1
+    try:
+        yield
+    finally:
+        _batch_depth -= 1
+        if not _batch_depth:
+            flush_metadata()
+
+
+def _close_journal():
+    flush_metadata()
+    if _journal is not None:
+        _journal.close()
+
+
+atexit.register(_close_journal)
 
 
 def add_file_metadata(original_path: str, compressed_path: str, original_size: int):
-    data = load_metadata()
-    data[compressed_path] = {
+    entry = {
         "original_path": original_path,
         "original_size": original_size,
         "compressed_time": datetime.now().isoformat()
     }
-    save_metadata(data)
+    load_metadata()[compressed_path] = entry
+    _append_op({"op": "mark", "path": compressed_path, "entry": entry})
 
 
 # ---  Test/Demo Execution ---
@@ -79,14 +307,18 @@ if __name__ == "__main__":
 
     files_info = get_file_stats(WATCH_DIRECTORY)
     files_to_compress = prioritize_files(files_info, PRIORITY_LIMIT)
+    # Sizes come from the scan's stat results; no second stat per file
+    file_sizes = {path: size for path, _, size in files_info}
 
-    for file_path in files_to_compress:
-        try:
-            compressed_path = file_path + ".gz"  #compression for test
-            original_size = os.path.getsize(file_path)
-            add_file_metadata(file_path, compressed_path, original_size)
-            log_event(f"Marked for compression: {file_path}")
-        except Exception as e:
-            log_error(f"Error processing {file_path}: {e}")
+    with metadata_batch():
+        for file_path in files_to_compress:
+            try:
+                compressed_path = file_path + ".gz"  #compression for test
+                original_size = file_sizes[file_path]
+                add_file_metadata(file_path, compressed_path, original_size)
+                log_event(f"Marked for compression: {file_path}")
+            except Exception as e:
+                log_error(f"Error processing {file_path}: {e}")
 
+    compact_metadata()
     log_event("Finished processing files.")
@@ -0,0 +1,36 @@
+import os
+import tempfile
+import unittest
+
+import compressor
+
+
+class SkipExtensionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.compressor = compressor.FileCompressor(os.path.join(self.tmp.name, "meta.json"))
+        # Fold the journal now, while the directory exists, leaving nothing for the atexit compaction
+        self.addCleanup(self.compressor.compact)
+
+    def write(self, name):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as f:
+            f.write("plain text " * 100)
+        return path
+
+    def test_bare_extension_name_is_rejected(self):
+        for name in (".gz", ".ZST", ".sys"):
+            with self.subTest(name=name):
+                path = self.write(name)
+                with self.assertRaises(ValueError):
+                    self.compressor.compress_file(path, "gzip")
+                self.assertFalse(os.path.exists(path + ".gz"))
+
+    def test_dotfile_is_still_compressed(self):
+        path = self.write(".bashrc")
+        self.assertEqual(self.compressor.compress_file(path, "gzip"), path + ".gz")
+
+
+if __name__ == "__main__":
+    unittest.main()
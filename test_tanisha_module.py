@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+import tanisha_module
+
+
+class TornJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.saved = {name: getattr(tanisha_module, name) for name in ("METADATA_FILE", "METADATA_LOG")}
+        tanisha_module.METADATA_FILE = os.path.join(self.tmp.name, "metadata.json")
+        tanisha_module.METADATA_LOG = os.path.join(self.tmp.name, "metadata.log")
+        self.addCleanup(self.restore)
+        self.reset()
+
+    def restore(self):
+        self.reset()
+        for name, value in self.saved.items():
+            setattr(tanisha_module, name, value)
+
+    def reset(self):
+        # What a fresh process starts with
+        if tanisha_module._journal is not None:
+            tanisha_module._journal.close()
+        tanisha_module._journal = None
+        tanisha_module._metadata_cache = tanisha_module._metadata_stamp = None
+        tanisha_module._pending.clear()
+
+    def test_records_after_torn_tail_survive_reload(self):
+        with tanisha_module.metadata_batch():
+            tanisha_module.add_file_metadata("a", "a.gz", 1)
+        # An interrupted write leaves half a record at the end of the log
+        with open(tanisha_module.METADATA_LOG, "ab") as f:
+            f.write(b'{"op": "mark", "path": "b.gz", "ent')
+        self.reset()
+
+        with tanisha_module.metadata_batch():
+            for i in range(8):
+                tanisha_module.add_file_metadata(f"c{i}", f"c{i}.gz", i)
+        self.reset()
+
+        data = tanisha_module.load_metadata()
+        self.assertEqual(sorted(data), ["a.gz"] + [f"c{i}.gz" for i in range(8)])
+
+
+if __name__ == "__main__":
+    unittest.main()